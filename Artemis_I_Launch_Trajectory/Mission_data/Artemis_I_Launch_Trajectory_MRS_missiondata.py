@@ -42,7 +42,7 @@ class MRSmissionData():
     #   - launchtype 1: t0 is the time at which MET (mission ellapsed time) = 0;
     #                   t0_UTC is always used, t0_JD is ignored
     t0_JD = 0 # JD TDB 
-    t0_UTC = datetime.datetime.fromisoformat('2022-11-16T06:47:44.000') # UTC
+    t0_UTC = datetime.datetime(2022, 11, 16, 6, 47, 44, 0) # UTC, 2022-11-16T06:47:44.000
    
 
     # t0_MET defines the MET-value at the moment of t0_JD/t0_UTC. Default is 0.
@@ -8,6 +8,8 @@ Created on Sat Mar  2 17:12:17 2024
 
 from myrocketsimulator import MRSlib, MRSvislib
 import numpy as np
+import math
+from collections import namedtuple
 import matplotlib.pyplot as plt
 
 
@@ -46,35 +48,40 @@ missionObject.run_mission()
 missionObject.get_EventsList(eventNames=['Mach1','MaxQ'])
 
 # add values to mission data frame
-missionObject.expand_DFname(['EarthApoPeri'])
-missionObject.expand_DFname(['EarthLLA'])
-missionObject.expand_DFname(['EarthOrbElements'])
+missionObject.expand_DFname(['EarthApoPeri',
+                             'EarthLLA',
+                             'EarthOrbElements'])
 
 # add values to event data frame
-missionObject.expand_DFname(['EarthLLA'], DFname='eventsDF')
-missionObject.expand_DFname(['EarthFPAHAvel'], DFname='eventsDF')
-missionObject.expand_DFname(['EarthFixedFPAHAvel'], DFname='eventsDF')
-missionObject.expand_DFname(['EarthOrbElements'], DFname='eventsDF')
-missionObject.expand_DFname(['EarthApoPeri'], DFname='eventsDF')
-missionObject.expand_DFname(['RangeToLaunchsite'], DFname='eventsDF')
+missionObject.expand_DFname(['EarthLLA',
+                             'EarthFPAHAvel',
+                             'EarthFixedFPAHAvel',
+                             'EarthOrbElements',
+                             'EarthApoPeri',
+                             'RangeToLaunchsite'], DFname='eventsDF')
 
 # generate MRS vision object
 visionObject = MRSvislib.MRSviewer(missionObject)
 
+# events and values used in several calls below
+eventOI = np.array(['Orbit insertion.'])
+eventRSV = np.array(['RSV'])
+valuesApoPeri = np.array(['Apogee','Perigee','EarthAlt','EarthOERAAN'])
+
 # show values at SRB staging
 visionObject.print_EventDetails(np.array(['SLS SRB terminated: Staging of SRB.']), np.array(['EarthAlt']))
 
 # show values at Orbit Insertion (OI)
-visionObject.print_EventDetails(np.array(['Orbit insertion.']), np.array(['EarthOESMA','EarthOEinclination','EarthVEL', 'EarthOEargPeriapsis']))
-visionObject.print_EventDetails(np.array(['Orbit insertion.']), np.array(['Apogee','Perigee','EarthAlt','EarthOERAAN']))
+visionObject.print_EventDetails(eventOI, np.array(['EarthOESMA','EarthOEinclination','EarthVEL', 'EarthOEargPeriapsis']))
+visionObject.print_EventDetails(eventOI, valuesApoPeri)
 
 # show values after PRM
-visionObject.print_EventDetails(np.array(['End PRM']), np.array(['Apogee','Perigee','EarthAlt','EarthOERAAN']))
+visionObject.print_EventDetails(np.array(['End PRM']), valuesApoPeri)
 
 # show values at RSV
-visionObject.print_EventDetails(np.array(['RSV']), np.array(['Apogee','Perigee','EarthOEinclination']))
-visionObject.print_EventDetails(np.array(['RSV']), np.array(['EarthOEargPeriapsis','EarthOEtrueAnomaly','EarthOERAAN']))
-visionObject.print_EventDetails(np.array(['RSV']), np.array(['EarthOEeccentricity','EarthOESMA','EarthAlt']))
+visionObject.print_EventDetails(eventRSV, np.array(['Apogee','Perigee','EarthOEinclination']))
+visionObject.print_EventDetails(eventRSV, np.array(['EarthOEargPeriapsis','EarthOEtrueAnomaly','EarthOERAAN']))
+visionObject.print_EventDetails(eventRSV, np.array(['EarthOEeccentricity','EarthOESMA','EarthAlt']))
 
 # define events for table 13 of [1]
 eventList = np.array([
@@ -152,48 +159,78 @@ RSV = np.array([-1.014728828823219E+04,  # km
 RSV_Simulated = np.array([-10128615.021821234, 10295475.460099723, 7060732.22322179,
                 -6776.333162878591, 643.4306613050503, 1102.1265577144918])
 
-# RSV position and velocity differences (in [m| and [m/s]])
-RSVpos_delta = RSV_Simulated[:3] - RSV[:3]*1000 
-RSVvel_delta = RSV_Simulated[3:] - RSV[3:]*1000
-
-# norm of position and velocity differences
-RSVpos_delta_norm = np.linalg.norm(RSVpos_delta)
-RSVvel_delta_norm = np.linalg.norm(RSVvel_delta)
-
-# norm of velocity vectors
-RSVvel_norm = np.linalg.norm(RSV[3:]*1000)
-RSV_Sim_vel_norm = np.linalg.norm(RSV_Simulated[3:])
-
-# differences of norms of velocity vectors
-RSVvel_norm_delta = RSV_Sim_vel_norm - RSVvel_norm
-
-# normalized velocity vector of RSV (used later for along/cross position)
-RSVvel_normalized = RSV[3:] / np.linalg.norm(RSV[3:] )
-
-# calculate along-track difference
-posdiff_alongtrack = RSVvel_normalized.dot(RSVpos_delta)
-# calculate cross-track difference
-posdiff_crosstrack = np.sqrt(RSVpos_delta_norm**2-posdiff_alongtrack**2)
+# reference state vector in SI units ([m] and [m/s])
+RSV_m = RSV * 1000
+
+
+# results of the RSV comparison (in order of display below)
+RSVstats = namedtuple('RSVstats', ['vel_norm_delta',   # difference of velocity norms
+                                   'vel_delta_norm',   # norm of velocity difference
+                                   'pos_delta_norm',   # norm of position difference
+                                   'pos_alongtrack',   # along-track position difference
+                                   'pos_crosstrack',   # cross-track position difference
+                                   'sim_vel_norm',     # norm of simulated velocity
+                                   'vel_angle_rad'])   # angle between velocity vectors
+
+
+def _rsv_stats(rsv_ref_m, rsv_sim):
+    """
+    Compares the simulated state vector with the reference state vector in a 
+    single pass of scalar math (both as length-6 arrays in [m] and [m/s]).
+    """
+    
+    dp2 = dv2 = vref2 = vsim2 = vdot = along = 0.
+    for i in range(3):
+        dp = rsv_sim[i] - rsv_ref_m[i]
+        dv = rsv_sim[i+3] - rsv_ref_m[i+3]
+        dp2 += dp * dp
+        dv2 += dv * dv
+        vref2 += rsv_ref_m[i+3] * rsv_ref_m[i+3]
+        vsim2 += rsv_sim[i+3] * rsv_sim[i+3]
+        vdot += rsv_sim[i+3] * rsv_ref_m[i+3]
+        along += rsv_ref_m[i+3] * dp
+    
+    vref_norm = math.sqrt(vref2)
+    vsim_norm = math.sqrt(vsim2)
+    
+    # along-track uses the normalized velocity vector of the RSV
+    along /= vref_norm
+    # clamp to avoid negative values from cancellation
+    cross = math.sqrt(max(dp2 - along * along, 0.))
+    
+    # clip to the domain of acos (rounding for almost parallel vectors)
+    cosangle = min(max(vdot / (vref_norm * vsim_norm), -1.), 1.)
+    
+    return RSVstats(vel_norm_delta=vsim_norm - vref_norm,
+                    vel_delta_norm=math.sqrt(dv2),
+                    pos_delta_norm=math.sqrt(dp2),
+                    pos_alongtrack=along,
+                    pos_crosstrack=cross,
+                    sim_vel_norm=vsim_norm,
+                    vel_angle_rad=math.acos(cosangle))
+
+
+# compare simulated and reference state vector
+rsvStats = _rsv_stats(RSV_m, RSV_Simulated)
+angle_vel_vec_deg = math.degrees(rsvStats.vel_angle_rad)
 
 # flown distance (from liftoff on)
-flown_distane = np.sum(np.linalg.norm(missionObject.missionDF.iloc[12:,9:12].to_numpy()-missionObject.missionDF.iloc[11:-1,9:12].to_numpy(),axis=1))
+pos = missionObject.missionDF.iloc[11:,9:12].to_numpy()
+pos_steps = np.diff(pos, axis=0)
+flown_distance = np.sqrt(np.einsum('ij,ij->i', pos_steps, pos_steps)).sum()
 
 # rel error wrt flown distance
-rel_error_posdiff_wrt_flowndist = RSVpos_delta_norm / flown_distane * 100
-
-# angle between velocity vectors
-angle_vel_vec_rad = np.arccos(np.dot(RSV_Simulated[3:],RSV[3:]*1000)/(RSVvel_norm*RSV_Sim_vel_norm))
-angle_vel_vec_deg = angle_vel_vec_rad * 180/np.pi
+rel_error_posdiff_wrt_flowndist = rsvStats.pos_delta_norm / flown_distance * 100
 
 
 # display found values
-print('Absolute difference in velocities: {} m/s'.format(np.round(RSVvel_norm_delta,3)))
-print('Norm of delta-v: {} m/s'.format(np.round(RSVvel_delta_norm,3)))
-print('Distance between positions: {} km'.format(np.round(RSVpos_delta_norm/1000,3)))
-print('Pos. difference along track: {} km'.format(np.round(posdiff_alongtrack/1000,3)))
-print('Pos. difference cross track: {} km'.format(np.round(posdiff_crosstrack/1000,3)))
-print('Along track difference in time: {} s'.format(posdiff_alongtrack/RSV_Sim_vel_norm))
+print('Absolute difference in velocities: {} m/s'.format(np.round(rsvStats.vel_norm_delta,3)))
+print('Norm of delta-v: {} m/s'.format(np.round(rsvStats.vel_delta_norm,3)))
+print('Distance between positions: {} km'.format(np.round(rsvStats.pos_delta_norm/1000,3)))
+print('Pos. difference along track: {} km'.format(np.round(rsvStats.pos_alongtrack/1000,3)))
+print('Pos. difference cross track: {} km'.format(np.round(rsvStats.pos_crosstrack/1000,3)))
+print('Along track difference in time: {} s'.format(rsvStats.pos_alongtrack/rsvStats.sim_vel_norm))
 print('Pos. difference w.r.t. to propagated distance: {}%'.format(np.round(rel_error_posdiff_wrt_flowndist,3)))
-print('Time difference w.r.t. to propagation duration: {}%'.format(np.round((posdiff_alongtrack/RSV_Sim_vel_norm)/8046.8*100,3)))
+print('Time difference w.r.t. to propagation duration: {}%'.format(np.round((rsvStats.pos_alongtrack/rsvStats.sim_vel_norm)/8046.8*100,3)))
 
 